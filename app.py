@@ -1,88 +1,118 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, send_from_directory, url_for
 from flask_socketio import SocketIO, emit
-import sqlite3
 from datetime import datetime
 import json
 import threading
+import atexit
+import gzip
+import hmac
+import mimetypes
 import os
+from maintenance import MaintenanceScheduler
+from content_store import note_summary, note_summary_from_full
+from storage import SQLiteStorageEngine, create_storage_engine_from_env
+from assets import build_assets, DIST_DIR
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-class NotesDatabase:
-    def __init__(self, db_path="notes.db"):
-        self.db_path = db_path
-        self.init_database()
-    
-    def get_connection(self):
-        """Get a new database connection"""
-        return sqlite3.connect(self.db_path)
-    
-    def init_database(self):
-        """Initialize the database with notes table"""
-        try:
-            print(f"Initializing database at: {self.db_path}")
-            
-            # Ensure directory exists
-            db_dir = os.path.dirname(self.db_path) or '.'
-            if not os.path.exists(db_dir):
-                os.makedirs(db_dir)
-            
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS notes (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        content TEXT NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # Add welcome note if database is empty
-                count = cursor.execute('SELECT COUNT(*) FROM notes').fetchone()[0]
-                if count == 0:
-                    cursor.execute("INSERT INTO notes (content) VALUES ('Welcome to Cloud Notes! 🚀')")
-                    cursor.execute("INSERT INTO notes (content) VALUES ('Your notes are now synced across devices!')")
-                    print("Added welcome notes to empty database")
-                
-                conn.commit()
-                print("Database initialized successfully!")
-                
-        except Exception as e:
-            print(f"Database initialization error: {e}")
-            raise e
-    
-    def get_all_notes(self):
-        """Get all notes from database"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, content, created_at FROM notes ORDER BY created_at DESC")
-            return cursor.fetchall()
+# JSON responses at least this large are gzipped for clients that accept it
+JSON_GZIP_THRESHOLD = int(os.environ.get('JSON_GZIP_THRESHOLD', 1024))
+
+# Fingerprinted assets never change, so browsers can cache them for a year
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Build fingerprinted, pre-compressed assets (falls back to plain /static URLs on failure)
+ASSETS_PATH = os.path.join(app.root_path, DIST_DIR)
+try:
+    asset_manifest = build_assets(os.path.join(app.root_path, 'static'), ASSETS_PATH)
+except Exception as e:
+    print(f"Asset build error: {e}")
+    asset_manifest = {}
+
+# Use different settings for production vs development
+debug_mode = os.environ.get('FLASK_ENV', 'development') == 'development'
+
+# In debug mode `python app.py` first runs a Werkzeug reloader process that only watches files
+# and re-runs this module as a child (with WERKZEUG_RUN_MAIN=true) to serve requests
+reloader_parent = (
+    __name__ == '__main__' and debug_mode and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+)
+
+# Initialize storage (STORAGE_ENGINE=memory keeps notes in RAM with periodic snapshots). The
+# reloader parent never serves requests, so it must not open its own engine: a second memory
+# engine would write snapshots of stale data over the serving process's snapshot
+db = None
+if not reloader_parent:
+    db = create_storage_engine_from_env()
+    db.seed_welcome_notes()
+    atexit.register(db.close)
+
+# Background maintenance (checkpoint, optimize, incremental vacuum, integrity check), only in the
+# serving process: the reloader parent never sees requests, so it would always look idle
+maintenance = None
+if isinstance(db, SQLiteStorageEngine):
+    maintenance = MaintenanceScheduler(
+        db.db_path,
+        idle_seconds=int(os.environ.get('MAINTENANCE_IDLE_SECONDS', 30))
+    )
+    if os.environ.get('MAINTENANCE_ENABLED', 'true').lower() == 'true':
+        maintenance.start()
+
+def mark_activity():
+    """Let the maintenance scheduler know the app is busy"""
+    if maintenance:
+        maintenance.touch()
+
+@app.before_request
+def record_activity():
+    """Record HTTP requests as activity (Socket.IO events bypass Flask's request hooks)"""
+    mark_activity()
+
+@app.after_request
+def compress_json_response(response):
+    """Gzip large JSON responses for clients that accept it"""
+    if response.mimetype != 'application/json' or response.direct_passthrough:
+        return response
     
-    def add_note(self, content):
-        """Add a new note to database"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO notes (content) VALUES (?)",
-                (content,)
-            )
-            conn.commit()
-            # Get the ID of the inserted note
-            cursor.execute("SELECT id, content, created_at FROM notes WHERE id = ?", (cursor.lastrowid,))
-            return cursor.fetchone()
+    response.vary.add('Accept-Encoding')
+    if 'Content-Encoding' in response.headers or 'gzip' not in request.accept_encodings:
+        return response
     
-    def delete_note(self, note_id):
-        """Delete a note from database"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM notes WHERE id = ?", (note_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+    data = response.get_data()
+    if len(data) >= JSON_GZIP_THRESHOLD:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
 
-# Initialize database
-db = NotesDatabase()
+@app.context_processor
+def asset_helpers():
+    """Make asset_url available in templates"""
+    def asset_url(filename, fallback=None):
+        """URL of the fingerprinted asset, the plain static file, or the fallback if neither exists"""
+        if filename in asset_manifest:
+            return url_for('serve_asset', filename=asset_manifest[filename])
+        if os.path.exists(os.path.join(app.static_folder, filename)):
+            return url_for('static', filename=filename)
+        return fallback
+    return {'asset_url': asset_url}
+
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    """Serve a fingerprinted asset, preferring a pre-compressed variant the client accepts"""
+    mimetype = mimetypes.guess_type(filename)[0]
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if encoding in request.accept_encodings and os.path.exists(os.path.join(ASSETS_PATH, filename + suffix)):
+            response = send_from_directory(ASSETS_PATH, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(ASSETS_PATH, filename, mimetype=mimetype)
+    
+    response.headers['Cache-Control'] = ASSET_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/')
 def index():
@@ -104,18 +134,51 @@ def health_check():
         'message': 'Notes app is running'
     })
 
+def is_admin_request():
+    """Check the X-Admin-Token header; admin endpoints are disabled unless ADMIN_TOKEN is set"""
+    token = os.environ.get('ADMIN_TOKEN')
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), token.encode())
+
+@app.route('/admin/maintenance', methods=['GET'])
+def maintenance_status():
+    """Admin endpoint showing database maintenance runs and file/page stats"""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    if maintenance is None:
+        return jsonify({'success': False, 'error': f'No maintenance for the {db.name} storage engine'}), 404
+    try:
+        return jsonify({'success': True, 'maintenance': maintenance.get_stats()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/admin/maintenance', methods=['POST'])
+def run_maintenance():
+    """Admin endpoint to run maintenance tasks immediately"""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    if maintenance is None:
+        return jsonify({'success': False, 'error': f'No maintenance for the {db.name} storage engine'}), 404
+    try:
+        data = request.get_json(silent=True) or {}
+        task = data.get('task')
+        if task:
+            if not isinstance(task, str) or task not in maintenance.tasks:
+                return jsonify({'success': False, 'error': f'Unknown task: {task}'}), 400
+            results = {task: maintenance.run_task(task)}
+        else:
+            results = maintenance.run_due_tasks(force=True)
+        return jsonify({'success': True, 'results': results, 'maintenance': maintenance.get_stats()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/notes', methods=['GET'])
 def get_notes():
     """API endpoint to get all notes"""
     try:
         notes = db.get_all_notes()
-        notes_list = []
-        for note in notes:
-            notes_list.append({
-                'id': note[0],
-                'content': note[1],
-                'created_at': note[2]
-            })
+        notes_list = [note_summary(note) for note in notes]
         return jsonify({'success': True, 'notes': notes_list})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -134,16 +197,33 @@ def add_note():
         note_data = {
             'id': note[0],
             'content': note[1],
-            'created_at': note[2]
+            'created_at': note[2],
+            'content_length': len(note[1])
         }
         
-        # Broadcast the new note to all connected clients
-        socketio.emit('note_added', note_data)
+        # Broadcast the new note to all connected clients (as a preview, like listings)
+        socketio.emit('note_added', note_summary_from_full(note))
         
         return jsonify({'success': True, 'note': note_data})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/notes/<int:note_id>', methods=['GET'])
+def get_note(note_id):
+    """API endpoint to get a single note with its full content"""
+    try:
+        note = db.get_note(note_id)
+        if note is None:
+            return jsonify({'success': False, 'error': 'Note not found'}), 404
+        return jsonify({'success': True, 'note': {
+            'id': note[0],
+            'content': note[1],
+            'created_at': note[2],
+            'content_length': len(note[1])
+        }})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/notes/<int:note_id>', methods=['DELETE'])
 def delete_note(note_id):
     """API endpoint to delete a note"""
@@ -161,6 +241,7 @@ def delete_note(note_id):
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
+    mark_activity()
     print('Client connected')
     emit('connected', {'message': 'Connected to server'})
 
@@ -172,15 +253,10 @@ def handle_disconnect():
 @socketio.on('request_notes')
 def handle_request_notes():
     """Handle request for all notes"""
+    mark_activity()
     try:
         notes = db.get_all_notes()
-        notes_list = []
-        for note in notes:
-            notes_list.append({
-                'id': note[0],
-                'content': note[1],
-                'created_at': note[2]
-            })
+        notes_list = [note_summary(note) for note in notes]
         emit('notes_update', {'notes': notes_list})
     except Exception as e:
         emit('error', {'message': str(e)})
@@ -203,7 +279,4 @@ if __name__ == '__main__':
     print(f"Access the web app at: http://localhost:{port}")
     print(f"API endpoints available at: http://localhost:{port}/api/notes")
     
-    # Use different settings for production vs development
-    debug_mode = os.environ.get('FLASK_ENV', 'development') == 'development'
-    
     socketio.run(app, debug=debug_mode, host='0.0.0.0', port=port)
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""Build fingerprinted, pre-compressed copies of the static assets.
+
+Usage: python assets.py [--fetch-vendor]
+
+Client libraries listed in VENDOR_ASSETS are committed under static/vendor;
+--fetch-vendor re-downloads any that are missing (e.g. after a version bump).
+Brotli variants are only written when the optional brotli package is installed.
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+import urllib.request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = 'static'
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_NAME = 'manifest.json'
+
+# Assets that get a content-hashed copy under static/dist (paths relative to static/)
+ASSET_FILES = ('css/style.css', 'js/app.js', 'vendor/socket.io.min.js')
+
+# Third-party client libraries bundled with the app, and where to fetch them from
+VENDOR_ASSETS = {
+    'vendor/socket.io.min.js': 'https://cdn.socket.io/4.7.2/socket.io.min.js',
+}
+
+# Smaller files are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+
+def fingerprint_name(filename, data):
+    """Insert a short content hash before the extension, e.g. js/app.js -> js/app.1a2b3c4d5e.js"""
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    root, ext = os.path.splitext(filename)
+    return f"{root}.{digest}{ext}"
+
+
+def write_file(path, data):
+    """Write a file atomically so concurrent workers never serve a partial asset"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_assets(static_dir=STATIC_DIR, dist_dir=DIST_DIR):
+    """Write fingerprinted gzip/brotli variants of ASSET_FILES and return the manifest"""
+    manifest = {}
+    for filename in ASSET_FILES:
+        source = os.path.join(static_dir, filename)
+        if not os.path.exists(source):
+            continue
+
+        with open(source, 'rb') as f:
+            data = f.read()
+
+        hashed_name = fingerprint_name(filename, data)
+        target = os.path.join(dist_dir, hashed_name)
+        manifest[filename] = hashed_name
+
+        # Content hashes make existing files immutable, so only new versions need writing
+        if os.path.exists(target):
+            continue
+
+        write_file(target, data)
+        if len(data) >= MIN_COMPRESS_SIZE:
+            write_file(target + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                write_file(target + '.br', brotli.compress(data, quality=11))
+
+    write_file(os.path.join(dist_dir, MANIFEST_NAME), json.dumps(manifest, indent=2).encode('utf-8'))
+    remove_stale_assets(dist_dir, manifest)
+    return manifest
+
+
+def remove_stale_assets(dist_dir, manifest):
+    """Delete old fingerprinted files (and their compressed variants) that the manifest no longer lists"""
+    keep = {MANIFEST_NAME}
+    for hashed_name in manifest.values():
+        for suffix in ('', '.gz', '.br'):
+            keep.add(os.path.normpath(hashed_name + suffix))
+
+    for root, _, files in os.walk(dist_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            # Leave other workers' in-progress writes alone
+            if name.endswith('.tmp'):
+                continue
+            if os.path.normpath(os.path.relpath(path, dist_dir)) not in keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # Another worker may have removed it already
+
+
+def fetch_vendor_assets(static_dir=STATIC_DIR, timeout=30):
+    """Download any missing VENDOR_ASSETS into the static directory"""
+    for filename, url in VENDOR_ASSETS.items():
+        target = os.path.join(static_dir, filename)
+        if os.path.exists(target):
+            continue
+        print(f"Downloading {url} -> {target}")
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            write_file(target, response.read())
+
+
+if __name__ == '__main__':
+    if '--fetch-vendor' in sys.argv:
+        fetch_vendor_assets()
+    built = build_assets()
+    for name, hashed_name in built.items():
+        print(f"{name} -> dist/{hashed_name}")
+    if brotli is None:
+        print("brotli is not installed - only gzip variants were written")
@@ -0,0 +1,39 @@
+"""Compare storage engines head-to-head on the same workload.
+
+Usage: python benchmark_storage.py [note_count]
+"""
+import os
+import sys
+import tempfile
+import time
+from storage import create_storage_engine
+
+
+def time_it(label, func, count):
+    """Run func and print the total and per-operation time"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<10} {elapsed * 1000:10.1f} ms  ({elapsed / count * 1e6:8.1f} µs/op)")
+
+
+def run_benchmark(engine, count):
+    """Add, list, fetch and delete count notes using the given engine"""
+    print(f"\n{engine.name} engine ({count} notes)")
+    ids = []
+    time_it('add', lambda: ids.extend(engine.add_note(f"Benchmark note {i} " * 10)[0] for i in range(count)), count)
+    time_it('list', lambda: [engine.get_all_notes() for _ in range(10)], 10)
+    time_it('get', lambda: [engine.get_note(note_id) for note_id in ids], count)
+    time_it('delete', lambda: [engine.delete_note(note_id) for note_id in ids], count)
+    engine.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        run_benchmark(create_storage_engine('sqlite', db_path=os.path.join(tmp_dir, 'bench.db')), count)
+        run_benchmark(create_storage_engine('memory', snapshot_path=os.path.join(tmp_dir, 'bench.json')), count)
+
+
+if __name__ == '__main__':
+    main()
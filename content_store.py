@@ -0,0 +1,76 @@
+import os
+import zlib
+
+# Notes larger than this (in UTF-8 bytes) are stored zlib-compressed
+COMPRESS_THRESHOLD = int(os.environ.get('COMPRESS_THRESHOLD', 4096))
+
+# Listings only carry this many characters of each note
+PREVIEW_LENGTH = int(os.environ.get('PREVIEW_LENGTH', 500))
+
+
+def make_preview(content):
+    """Return the listing preview for a note, or None if the note is short enough to list in full"""
+    return content[:PREVIEW_LENGTH] if len(content) > PREVIEW_LENGTH else None
+
+
+def encode_content(content):
+    """Prepare note content for storage, returning (stored, compressed, content_length, preview)"""
+    raw = content.encode('utf-8')
+    preview = make_preview(content)
+
+    if len(raw) >= COMPRESS_THRESHOLD:
+        packed = zlib.compress(raw, 6)
+        # Only keep the compressed form when it actually saves space
+        if len(packed) < len(raw):
+            # Listings read the preview column, so compressed notes always need one
+            return packed, 1, len(content), preview if preview is not None else content
+
+    return content, 0, len(content), preview
+
+
+def decode_content(stored, compressed):
+    """Turn a stored content value back into text"""
+    if compressed:
+        return zlib.decompress(stored).decode('utf-8')
+    return stored
+
+
+def note_summary(note):
+    """Format a listed (id, preview, created_at, content_length) note, flagging truncated previews"""
+    note_id, content, created_at, content_length = note
+    if content_length is None:
+        content_length = len(content)
+    return {
+        'id': note_id,
+        'content': content,
+        'created_at': created_at,
+        'content_length': content_length,
+        'truncated': len(content) < content_length
+    }
+
+
+def note_summary_from_full(note):
+    """Format a full (id, content, created_at) note the way listings show it"""
+    note_id, content, created_at = note
+    return note_summary((note_id, make_preview(content) or content, created_at, len(content)))
+
+
+def migrate_notes_table(conn):
+    """Add the size-tiered storage columns to an existing notes table and backfill them"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(notes)").fetchall()]
+    if 'content_length' in columns:
+        return
+
+    print("Migrating notes table for compressed storage...")
+    conn.execute("ALTER TABLE notes ADD COLUMN content_length INTEGER")
+    conn.execute("ALTER TABLE notes ADD COLUMN compressed INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE notes ADD COLUMN preview TEXT")
+
+    rows = conn.execute("SELECT id, content FROM notes").fetchall()
+    for note_id, content in rows:
+        stored, compressed, length, preview = encode_content(content)
+        conn.execute(
+            "UPDATE notes SET content = ?, compressed = ?, content_length = ?, preview = ? WHERE id = ?",
+            (stored, compressed, length, preview, note_id)
+        )
+    conn.commit()
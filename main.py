@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import sqlite3
 from datetime import datetime
 import os
 import requests
@@ -9,6 +8,8 @@ import socketio
 import json
 from queue import Queue
 import time
+from storage import create_storage_engine_from_env
+from content_store import note_summary
 
 class NotesApp:
     def __init__(self, root):
@@ -43,20 +44,8 @@ class NotesApp:
             self.start_keep_warm()
     
     def init_database(self):
-        """Initialize SQLite database and create notes table if it doesn't exist"""
-        self.db_path = "notes.db"
-        self.conn = sqlite3.connect(self.db_path)
-        self.cursor = self.conn.cursor()
-        
-        # Create notes table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        self.conn.commit()
+        """Initialize the local storage engine used when the server is unavailable"""
+        self.storage = create_storage_engine_from_env()
     
     def create_gui(self):
         """Create the main GUI interface"""
@@ -335,12 +324,8 @@ class NotesApp:
     def add_note_local(self, content):
         """Add note to local database"""
         try:
-            # Insert note into local database
-            self.cursor.execute(
-                "INSERT INTO notes (content) VALUES (?)",
-                (content,)
-            )
-            self.conn.commit()
+            # Insert note into local database (large notes are stored compressed)
+            self.storage.add_note(content)
             
             # Clear input
             self.text_input.delete("1.0", tk.END)
@@ -348,7 +333,7 @@ class NotesApp:
             # Refresh notes display
             self.load_notes()
             
-        except sqlite3.Error as e:
+        except Exception as e:
             messagebox.showerror("Database Error", f"Error saving note: {e}")
     
     def delete_note(self, note_id):
@@ -383,10 +368,9 @@ class NotesApp:
     def delete_note_local(self, note_id):
         """Delete note from local database"""
         try:
-            self.cursor.execute("DELETE FROM notes WHERE id = ?", (note_id,))
-            self.conn.commit()
+            self.storage.delete_note(note_id)
             self.load_notes()
-        except sqlite3.Error as e:
+        except Exception as e:
             messagebox.showerror("Database Error", f"Error deleting note: {e}")
     
     def load_notes(self):
@@ -419,21 +403,14 @@ class NotesApp:
         """Load and display all notes from local database"""
         try:
             # Fetch all notes from database
-            self.cursor.execute("SELECT id, content, created_at FROM notes ORDER BY created_at DESC")
-            notes = self.cursor.fetchall()
+            notes = self.storage.get_all_notes()
             
             # Convert to API format
-            notes_list = []
-            for note in notes:
-                notes_list.append({
-                    'id': note[0],
-                    'content': note[1],
-                    'created_at': note[2]
-                })
+            notes_list = [note_summary(note) for note in notes]
             
             self.display_notes(notes_list)
                 
-        except sqlite3.Error as e:
+        except Exception as e:
             messagebox.showerror("Database Error", f"Error loading notes: {e}")
     
     def display_notes(self, notes):
@@ -457,12 +434,15 @@ class NotesApp:
         # Display each note
         for note in notes:
             if isinstance(note, dict):
-                self.create_note_widget(note['id'], note['content'], note['created_at'])
+                self.create_note_widget(
+                    note['id'], note['content'], note['created_at'],
+                    note.get('truncated', False), note.get('content_length')
+                )
             else:
                 # Handle tuple format (from local database)
                 self.create_note_widget(note[0], note[1], note[2])
     
-    def create_note_widget(self, note_id, content, created_at):
+    def create_note_widget(self, note_id, content, created_at, truncated=False, content_length=None):
         """Create a widget for displaying a single note"""
         # Note container
         note_frame = tk.Frame(
@@ -490,6 +470,24 @@ class NotesApp:
         )
         content_label.pack(anchor="w", fill=tk.X)
         
+        # Large notes are listed as previews; load the full body on demand
+        if truncated:
+            content_label.config(text=content + "…")
+            show_more_button = tk.Button(
+                content_frame,
+                text=f"Show full note ({content_length:,} characters)",
+                bg="white",
+                fg="#FF69B4",
+                font=("Arial", 9, "bold"),
+                relief=tk.FLAT,
+                borderwidth=0,
+                cursor="hand2"
+            )
+            show_more_button.config(
+                command=lambda: self.show_full_note(note_id, content_label, show_more_button)
+            )
+            show_more_button.pack(anchor="w", pady=(5, 0))
+        
         # Timestamp
         timestamp_label = tk.Label(
             content_frame,
@@ -516,10 +514,32 @@ class NotesApp:
         )
         delete_button.pack(side=tk.RIGHT, padx=10, pady=10)
     
+    def get_full_note(self, note_id):
+        """Fetch the full content of a single note from API or database"""
+        if self.use_api:
+            response = requests.get(f"{self.api_base_url}/api/notes/{note_id}", timeout=10)
+            data = response.json()
+            if response.status_code != 200 or not data['success']:
+                raise Exception(data.get('error', f"Server error: {response.status_code}"))
+            return data['note']['content']
+        
+        note = self.storage.get_note(note_id)
+        if note is None:
+            raise Exception("Note not found")
+        return note[1]
+    
+    def show_full_note(self, note_id, content_label, show_more_button):
+        """Replace a note preview with its full content"""
+        try:
+            content_label.config(text=self.get_full_note(note_id))
+            show_more_button.destroy()
+        except Exception as e:
+            messagebox.showerror("Load Error", f"Failed to load full note: {e}")
+    
     def __del__(self):
-        """Close database connection when app is destroyed"""
-        if hasattr(self, 'conn'):
-            self.conn.close()
+        """Close local storage when app is destroyed"""
+        if hasattr(self, 'storage'):
+            self.storage.close()
 
 def main():
     """Main function to run the application"""
@@ -528,8 +548,8 @@ def main():
     
     # Handle window closing
     def on_closing():
-        if hasattr(app, 'conn'):
-            app.conn.close()
+        if hasattr(app, 'storage'):
+            app.storage.close()
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -0,0 +1,196 @@
+import sqlite3
+import threading
+import time
+import os
+from contextlib import closing
+from datetime import datetime
+
+
+class MaintenanceScheduler:
+    """Runs SQLite housekeeping for notes.db in the background while the app is idle"""
+
+    # task name -> (default interval in seconds, default time budget in seconds);
+    # tasks with no interval never run on a schedule and must be triggered explicitly
+    DEFAULT_TASKS = {
+        'checkpoint': (60, 1.0),
+        'optimize': (3600, 2.0),
+        'incremental_vacuum': (600, 1.0),
+        'integrity_check': (86400, 5.0),
+        'enable_auto_vacuum': (None, 30.0),
+    }
+
+    def __init__(self, db_path, idle_seconds=30, poll_interval=5, vacuum_pages_per_step=64, tasks=None):
+        self.db_path = db_path
+        self.idle_seconds = idle_seconds
+        self.poll_interval = poll_interval
+        self.vacuum_pages_per_step = vacuum_pages_per_step
+        self.tasks = dict(self.DEFAULT_TASKS)
+        if tasks:
+            self.tasks.update(tasks)
+
+        self.last_activity = time.monotonic()
+        self.last_run = {}
+        self.last_result = {}
+        self.reclaimed_bytes_total = 0
+
+        self._next_due = {name: 0 for name in self.tasks}
+        self._run_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def touch(self):
+        """Record request activity so maintenance backs off while the app is busy"""
+        self.last_activity = time.monotonic()
+
+    def is_idle(self):
+        """Check whether no request has been seen for idle_seconds"""
+        return time.monotonic() - self.last_activity >= self.idle_seconds
+
+    def start(self):
+        """Start the background maintenance thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='db-maintenance', daemon=True)
+        self._thread.start()
+        print(f"Database maintenance scheduler started for: {self.db_path}")
+
+    def stop(self):
+        """Stop the background maintenance thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _run_loop(self):
+        """Wake up periodically and run whatever tasks are due while idle"""
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.run_due_tasks()
+            except Exception as e:
+                print(f"Database maintenance error: {e}")
+
+    def run_due_tasks(self, force=False):
+        """Run every task whose interval has elapsed, stopping as soon as requests arrive"""
+        results = {}
+        for name, (interval, _) in self.tasks.items():
+            if interval is None:
+                continue
+            if not force and (not self.is_idle() or time.monotonic() < self._next_due[name]):
+                continue
+            results[name] = self.run_task(name)
+        return results
+
+    def run_task(self, name):
+        """Run a single maintenance task within its time budget and record the result"""
+        interval, budget = self.tasks[name]
+        task = getattr(self, f'_task_{name}')
+
+        with self._run_lock:
+            started = time.monotonic()
+            try:
+                with closing(self._connect()) as conn:
+                    result = task(conn, started + budget)
+                result['status'] = 'ok'
+            except sqlite3.OperationalError as e:
+                # The progress handler aborts statements once the budget runs out
+                if 'interrupted' in str(e):
+                    result = {'status': 'budget_exceeded'}
+                else:
+                    result = {'status': 'error', 'error': str(e)}
+            except Exception as e:
+                result = {'status': 'error', 'error': str(e)}
+
+            result['duration_ms'] = round((time.monotonic() - started) * 1000, 1)
+            self.last_run[name] = datetime.now().isoformat()
+            self.last_result[name] = result
+            if interval is not None:
+                self._next_due[name] = time.monotonic() + interval
+            return result
+
+    def _connect(self):
+        """Open a short-lived connection that gives way to request handlers"""
+        conn = sqlite3.connect(self.db_path, timeout=0.5)
+        conn.isolation_level = None
+        return conn
+
+    def _with_deadline(self, conn, deadline):
+        """Abort the running statement once the deadline passes"""
+        conn.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, 1000)
+
+    def _task_checkpoint(self, conn, deadline):
+        """Copy WAL frames back into the main database file"""
+        if conn.execute('PRAGMA journal_mode').fetchone()[0] != 'wal':
+            return {'skipped': 'journal_mode is not WAL'}
+        self._with_deadline(conn, deadline)
+        busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+        return {'busy': busy, 'wal_frames': log_frames, 'checkpointed_frames': checkpointed}
+
+    def _task_optimize(self, conn, deadline):
+        """Refresh query planner statistics, bounded by analysis_limit"""
+        self._with_deadline(conn, deadline)
+        conn.execute('PRAGMA analysis_limit = 400')
+        conn.execute('PRAGMA optimize')
+        return {}
+
+    def _task_incremental_vacuum(self, conn, deadline):
+        """Release free pages back to the filesystem in small steps"""
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            return {'skipped': 'auto_vacuum is not INCREMENTAL (run enable_auto_vacuum)', 'reclaimed_bytes': 0}
+
+        freed_pages = 0
+        while time.monotonic() < deadline:
+            free_before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if free_before == 0:
+                break
+            conn.execute(f'PRAGMA incremental_vacuum({self.vacuum_pages_per_step})').fetchall()
+            freed_pages += free_before - conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+        reclaimed = freed_pages * page_size
+        self.reclaimed_bytes_total += reclaimed
+        return {'reclaimed_bytes': reclaimed, 'freelist_remaining': conn.execute('PRAGMA freelist_count').fetchone()[0]}
+
+    def _task_enable_auto_vacuum(self, conn, deadline):
+        """Convert an existing database to incremental auto-vacuum with a one-off full VACUUM"""
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            return {'skipped': 'auto_vacuum is already INCREMENTAL', 'reclaimed_bytes': 0}
+
+        size_before = os.path.getsize(self.db_path)
+        self._with_deadline(conn, deadline)
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        # VACUUM rewrites the whole file; if the budget runs out it is rolled back untouched
+        conn.execute('VACUUM')
+
+        reclaimed = max(0, size_before - os.path.getsize(self.db_path))
+        self.reclaimed_bytes_total += reclaimed
+        return {'reclaimed_bytes': reclaimed}
+
+    def _task_integrity_check(self, conn, deadline):
+        """Run a quick integrity check and report any problems found"""
+        self._with_deadline(conn, deadline)
+        rows = [row[0] for row in conn.execute('PRAGMA quick_check(20)').fetchall()]
+        return {'healthy': rows == ['ok'], 'problems': [] if rows == ['ok'] else rows}
+
+    def get_stats(self):
+        """Collect last run times, reclaimed space and file/page statistics"""
+        stats = {
+            'db_path': self.db_path,
+            'idle': self.is_idle(),
+            'running': bool(self._thread and self._thread.is_alive()),
+            'last_run': dict(self.last_run),
+            'last_result': dict(self.last_result),
+            'reclaimed_bytes_total': self.reclaimed_bytes_total,
+            'files': {},
+            'pages': {},
+        }
+
+        for suffix in ('', '-wal', '-shm'):
+            path = self.db_path + suffix
+            stats['files'][os.path.basename(path)] = os.path.getsize(path) if os.path.exists(path) else 0
+
+        with closing(self._connect()) as conn:
+            for pragma in ('page_size', 'page_count', 'freelist_count', 'auto_vacuum', 'journal_mode'):
+                stats['pages'][pragma] = conn.execute(f'PRAGMA {pragma}').fetchone()[0]
+
+        return stats
@@ -5,11 +5,25 @@ class NotesWebApp {
         this.isConnected = false;
         this.pollingInterval = null;
         
+        // Keyed, windowed rendering state
+        this.noteIndex = new Map();      // note id -> note data
+        this.renderedNodes = new Map();  // note id -> DOM node (only notes near the viewport)
+        this.noteHeights = new Map();    // note id -> measured height including gap
+        this.fullContent = new Map();    // note id -> full content for expanded previews
+        this.freshNoteIds = new Set();   // notes that should play the slide-in animation
+        this.offsets = new Float64Array(1);
+        this.layoutDirty = true;
+        this.renderPending = false;
+        this.estimatedNoteHeight = 90;
+        this.noteGap = null;            // .note-item margin-bottom, read from CSS on first measure
+        this.overscan = 10;
+        
         console.log('🚀 Initializing Notes Web App...');
         this.init();
     }
     
     init() {
+        this.setupNotesContainer();
         this.setupEventListeners();
         this.loadNotes(); // Load notes first
         this.connectToServer(); // Then try WebSocket connection
@@ -30,6 +44,27 @@ class NotesWebApp {
         });
     }
     
+    setupNotesContainer() {
+        const container = document.getElementById('notesContainer');
+        
+        // Spacers stand in for the notes above and below the rendered window
+        this.topSpacer = document.createElement('div');
+        this.topSpacer.className = 'notes-spacer';
+        this.bottomSpacer = document.createElement('div');
+        this.bottomSpacer.className = 'notes-spacer';
+        container.appendChild(this.topSpacer);
+        container.appendChild(this.bottomSpacer);
+        
+        container.addEventListener('scroll', () => this.scheduleRender(), { passive: true });
+        window.addEventListener('resize', () => {
+            // Wrapping changes with width, so every measured height is stale
+            this.noteHeights.clear();
+            this.noteGap = null;
+            this.layoutDirty = true;
+            this.scheduleRender();
+        });
+    }
+    
     connectToServer() {
         try {
             console.log('Attempting to connect to WebSocket...');
@@ -213,118 +248,252 @@ class NotesWebApp {
     }
     
     updateNotesDisplay(notes) {
-        this.notes = notes;
-        const container = document.getElementById('notesContainer');
-        const noNotesMessage = document.getElementById('noNotesMessage');
+        // Keyed diff: keep the existing object for unchanged notes so render() can skip them
+        const nextIndex = new Map();
+        this.notes = notes.map(note => {
+            const previous = this.noteIndex.get(note.id);
+            const unchanged = previous &&
+                previous.content === note.content &&
+                previous.created_at === note.created_at &&
+                previous.content_length === note.content_length;
+            if (!unchanged) {
+                this.noteHeights.delete(note.id);
+                this.fullContent.delete(note.id);
+            }
+            const kept = unchanged ? previous : note;
+            nextIndex.set(note.id, kept);
+            return kept;
+        });
+        this.noteIndex = nextIndex;
+        this.layoutDirty = true;
+        this.scheduleRender();
+    }
+    
+    addNoteToDisplay(noteData, skipAnimation = false) {
+        // Check if note already exists (to prevent duplicates)
+        if (this.noteIndex.has(noteData.id)) {
+            return;
+        }
+        
+        // Newest notes first
+        this.notes.unshift(noteData);
+        this.noteIndex.set(noteData.id, noteData);
+        if (!skipAnimation) {
+            this.freshNoteIds.add(noteData.id);
+        }
+        this.layoutDirty = true;
+        this.scheduleRender();
+    }
+    
+    removeNoteFromDisplay(noteId) {
+        if (!this.noteIndex.has(noteId)) {
+            return;
+        }
         
-        // Clear existing notes (except no notes message)
-        const existingNotes = container.querySelectorAll('.note-item');
-        existingNotes.forEach(note => note.remove());
+        const removeFromModel = () => {
+            this.notes = this.notes.filter(note => note.id !== noteId);
+            this.noteIndex.delete(noteId);
+            this.noteHeights.delete(noteId);
+            this.fullContent.delete(noteId);
+            this.layoutDirty = true;
+            this.scheduleRender();
+        };
         
-        if (notes.length === 0) {
-            noNotesMessage.style.display = 'block';
+        const noteElement = this.renderedNodes.get(noteId);
+        if (noteElement) {
+            noteElement.style.animation = 'slideOut 0.3s ease-out';
+            setTimeout(removeFromModel, 300);
         } else {
-            noNotesMessage.style.display = 'none';
-            
-            // Add notes in order (server already sends newest first)
-            notes.forEach(note => {
-                this.addNoteToDisplayInOrder(note, true);
-            });
+            removeFromModel();
+        }
+    }
+    
+    scheduleRender() {
+        // Batch every model change in a frame into a single DOM update
+        if (this.renderPending) {
+            return;
         }
+        this.renderPending = true;
+        requestAnimationFrame(() => {
+            this.renderPending = false;
+            this.render();
+        });
+    }
+    
+    noteHeight(noteId) {
+        return this.noteHeights.get(noteId) || this.estimatedNoteHeight;
     }
     
-    addNoteToDisplayInOrder(noteData, skipAnimation = false) {
+    updateLayout() {
+        // offsets[i] is the distance from the top of the list to note i
+        const offsets = new Float64Array(this.notes.length + 1);
+        for (let i = 0; i < this.notes.length; i++) {
+            offsets[i + 1] = offsets[i] + this.noteHeight(this.notes[i].id);
+        }
+        this.offsets = offsets;
+        this.layoutDirty = false;
+    }
+    
+    findNoteIndex(offset) {
+        // Binary search for the note that contains the given list offset
+        let low = 0;
+        let high = this.notes.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (this.offsets[mid + 1] <= offset) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        return low;
+    }
+    
+    render() {
         const container = document.getElementById('notesContainer');
         const noNotesMessage = document.getElementById('noNotesMessage');
         
-        // Hide no notes message
-        noNotesMessage.style.display = 'none';
+        if (this.layoutDirty) {
+            this.updateLayout();
+        }
         
-        // Check if note already exists (to prevent duplicates)
-        if (document.querySelector(`[data-note-id="${noteData.id}"]`)) {
-            return;
+        noNotesMessage.style.display = this.notes.length === 0 ? 'block' : 'none';
+        
+        // Only keep DOM nodes for notes in or near the viewport
+        const listScrollTop = container.scrollTop - this.topSpacer.offsetTop;
+        const start = Math.max(0, this.findNoteIndex(listScrollTop) - this.overscan);
+        const end = Math.min(this.notes.length, this.findNoteIndex(listScrollTop + container.clientHeight) + 1 + this.overscan);
+        
+        const visibleIds = new Set();
+        for (let i = start; i < end; i++) {
+            visibleIds.add(this.notes[i].id);
         }
         
-        const noteElement = document.createElement('div');
-        noteElement.className = 'note-item';
-        noteElement.setAttribute('data-note-id', noteData.id);
+        this.renderedNodes.forEach((node, noteId) => {
+            if (!visibleIds.has(noteId)) {
+                node.remove();
+                this.renderedNodes.delete(noteId);
+            }
+        });
         
-        if (skipAnimation) {
-            noteElement.style.animation = 'none';
+        // Insert, patch or move only the nodes that need it
+        let previousNode = this.topSpacer;
+        for (let i = start; i < end; i++) {
+            const note = this.notes[i];
+            const node = this.renderNote(note);
+            if (previousNode.nextSibling !== node) {
+                container.insertBefore(node, previousNode.nextSibling);
+            }
+            previousNode = node;
         }
         
-        const createdDate = new Date(noteData.created_at).toLocaleString();
+        this.topSpacer.style.height = `${this.offsets[start]}px`;
+        this.bottomSpacer.style.height = `${this.offsets[this.notes.length] - this.offsets[end]}px`;
         
-        noteElement.innerHTML = `
-            <div class="note-content">
-                <div class="note-text">${this.escapeHtml(noteData.content)}</div>
-                <div class="note-timestamp">Created: ${createdDate}</div>
-            </div>
-            <button class="delete-btn" onclick="app.deleteNote(${noteData.id})">✗</button>
-        `;
+        // Notes added outside the window should not slide in later when scrolled to
+        this.freshNoteIds.clear();
         
-        // Simply append to container (notes come pre-sorted from server)
-        container.appendChild(noteElement);
+        this.measureRenderedNotes(start, end, listScrollTop);
     }
     
-    addNoteToDisplay(noteData, skipAnimation = false) {
-        const container = document.getElementById('notesContainer');
-        const noNotesMessage = document.getElementById('noNotesMessage');
+    renderNote(note) {
+        const expanded = this.fullContent.has(note.id);
+        let node = this.renderedNodes.get(note.id);
         
-        // Hide no notes message
-        noNotesMessage.style.display = 'none';
+        if (node && node._note === note && node._expanded === expanded) {
+            return node;
+        }
         
-        // Check if note already exists (to prevent duplicates)
-        if (document.querySelector(`[data-note-id="${noteData.id}"]`)) {
-            return;
+        if (!node) {
+            node = document.createElement('div');
+            node.className = 'note-item';
+            node.setAttribute('data-note-id', note.id);
+            this.renderedNodes.set(note.id, node);
         }
         
-        const noteElement = document.createElement('div');
-        noteElement.className = 'note-item';
-        noteElement.setAttribute('data-note-id', noteData.id);
+        // Only freshly added notes slide in; notes scrolled into view appear immediately
+        if (this.freshNoteIds.has(note.id)) {
+            this.freshNoteIds.delete(note.id);
+            node.style.animation = '';
+        } else {
+            node.style.animation = 'none';
+        }
         
-        if (skipAnimation) {
-            noteElement.style.animation = 'none';
+        node.innerHTML = this.noteInnerHtml(note, expanded ? this.fullContent.get(note.id) : null);
+        node._note = note;
+        node._expanded = expanded;
+        return node;
+    }
+    
+    measureRenderedNotes(start, end, listScrollTop) {
+        // Replace estimated heights with real ones so spacers and scrolling stay accurate
+        let changed = false;
+        let anchorShift = 0;
+        for (let i = start; i < end; i++) {
+            const note = this.notes[i];
+            const node = this.renderedNodes.get(note.id);
+            if (this.noteGap === null) {
+                this.noteGap = parseFloat(getComputedStyle(node).marginBottom) || 0;
+            }
+            const height = node.offsetHeight + this.noteGap;
+            const previous = this.noteHeight(note.id);
+            if (height !== previous) {
+                this.noteHeights.set(note.id, height);
+                changed = true;
+                // Keep the notes currently on screen in place when notes above them resize
+                if (this.offsets[i + 1] <= listScrollTop) {
+                    anchorShift += height - previous;
+                }
+            }
         }
         
+        if (changed) {
+            let total = 0;
+            this.noteHeights.forEach(height => { total += height; });
+            this.estimatedNoteHeight = total / this.noteHeights.size;
+            this.layoutDirty = true;
+            if (anchorShift) {
+                document.getElementById('notesContainer').scrollTop += anchorShift;
+            }
+            this.scheduleRender();
+        }
+    }
+    
+    noteInnerHtml(noteData, fullContent = null) {
         const createdDate = new Date(noteData.created_at).toLocaleString();
+        const truncated = noteData.truncated && fullContent === null;
+        
+        // Large notes arrive as previews; the full body is fetched on demand
+        const showMore = truncated
+            ? `<button class="show-more-btn" onclick="app.showFullNote(${noteData.id})">Show full note (${noteData.content_length.toLocaleString()} characters)</button>`
+            : '';
         
-        noteElement.innerHTML = `
+        return `
             <div class="note-content">
-                <div class="note-text">${this.escapeHtml(noteData.content)}</div>
+                <div class="note-text">${this.escapeHtml(fullContent !== null ? fullContent : noteData.content)}${truncated ? '…' : ''}</div>
+                ${showMore}
                 <div class="note-timestamp">Created: ${createdDate}</div>
             </div>
             <button class="delete-btn" onclick="app.deleteNote(${noteData.id})">✗</button>
         `;
-        
-        // Add to the beginning of the container (newest notes first)
-        const firstNote = container.querySelector('.note-item');
-        if (firstNote) {
-            container.insertBefore(noteElement, firstNote);
-        } else {
-            // If no notes exist, add after the no-notes message
-            const noNotesMsg = container.querySelector('#noNotesMessage');
-            if (noNotesMsg && noNotesMsg.nextSibling) {
-                container.insertBefore(noteElement, noNotesMsg.nextSibling);
-            } else {
-                container.appendChild(noteElement);
-            }
-        }
     }
     
-    removeNoteFromDisplay(noteId) {
-        const noteElement = document.querySelector(`[data-note-id="${noteId}"]`);
-        if (noteElement) {
-            noteElement.style.animation = 'slideOut 0.3s ease-out';
-            setTimeout(() => {
-                noteElement.remove();
-                
-                // Show no notes message if no notes left
-                const remainingNotes = document.querySelectorAll('.note-item');
-                if (remainingNotes.length === 0) {
-                    document.getElementById('noNotesMessage').style.display = 'block';
-                }
-            }, 300);
+    async showFullNote(noteId) {
+        try {
+            const response = await fetch(`/api/notes/${noteId}`);
+            const data = await response.json();
+            
+            if (data.success) {
+                this.fullContent.set(noteId, data.note.content);
+                this.noteHeights.delete(noteId);
+                this.layoutDirty = true;
+                this.scheduleRender();
+            } else {
+                this.showNotification('Failed to load note: ' + data.error, 'error');
+            }
+        } catch (error) {
+            console.error('Failed to load note:', error);
+            this.showNotification('Failed to load note', 'error');
         }
     }
     
@@ -0,0 +1,412 @@
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+import random
+import json
+import os
+from datetime import datetime, timezone
+from content_store import encode_content, decode_content, migrate_notes_table
+
+WELCOME_NOTES = ('Welcome to Cloud Notes! 🚀', 'Your notes are now synced across devices!')
+
+
+class StorageEngine(ABC):
+    """Interface shared by every notes storage backend.
+
+    Listings return (id, preview, created_at, content_length) tuples, newest first;
+    single notes are returned as (id, content, created_at) with the full content.
+    """
+
+    name = None
+
+    @abstractmethod
+    def get_all_notes(self):
+        """Get all notes as (id, preview, created_at, content_length), newest first"""
+
+    @abstractmethod
+    def get_note(self, note_id):
+        """Get a single note as (id, content, created_at), or None if it doesn't exist"""
+
+    @abstractmethod
+    def add_note(self, content):
+        """Add a new note and return it as (id, content, created_at)"""
+
+    @abstractmethod
+    def delete_note(self, note_id):
+        """Delete a note, returning True if it existed"""
+
+    @abstractmethod
+    def count_notes(self):
+        """Return the number of stored notes"""
+
+    def close(self):
+        """Release any resources held by the engine"""
+
+    def seed_welcome_notes(self):
+        """Add the welcome notes if storage is empty"""
+        if self.count_notes() == 0:
+            for content in WELCOME_NOTES:
+                self.add_note(content)
+            print("Added welcome notes to empty database")
+
+
+class SQLiteStorageEngine(StorageEngine):
+    """Notes stored in a SQLite database file"""
+
+    name = 'sqlite'
+
+    JOURNAL_MODES = ('delete', 'truncate', 'persist', 'memory', 'wal', 'off')
+
+    def __init__(self, db_path="notes.db", journal_mode=None):
+        if journal_mode and journal_mode.lower() not in self.JOURNAL_MODES:
+            raise ValueError(f"Unknown SQLite journal mode: {journal_mode}")
+        self.db_path = db_path
+        # None keeps whatever journal mode the database file already uses
+        self.journal_mode = journal_mode.lower() if journal_mode else None
+        self.init_database()
+
+    def get_connection(self):
+        """Get a new database connection"""
+        return sqlite3.connect(self.db_path)
+
+    def init_database(self):
+        """Initialize the database with notes table"""
+        try:
+            print(f"Initializing database at: {self.db_path}")
+
+            # Ensure directory exists
+            db_dir = os.path.dirname(self.db_path) or '.'
+            if not os.path.exists(db_dir):
+                os.makedirs(db_dir)
+
+            self.configure_storage()
+
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS notes (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        content TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        content_length INTEGER,
+                        compressed INTEGER NOT NULL DEFAULT 0,
+                        preview TEXT
+                    )
+                ''')
+                migrate_notes_table(conn)
+                conn.commit()
+                print("Database initialized successfully!")
+
+        except Exception as e:
+            print(f"Database initialization error: {e}")
+            raise e
+
+    def configure_storage(self):
+        """Apply the configured journal mode and enable incremental auto-vacuum on new databases"""
+        conn = self.get_connection()
+        try:
+            # auto_vacuum is free to set before anything is written to a new file; existing
+            # files are converted explicitly by the enable_auto_vacuum maintenance task
+            if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            if self.journal_mode:
+                conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        finally:
+            conn.close()
+
+    def insert_note(self, cursor, content):
+        """Insert a note, compressing large content, and return its ID"""
+        stored, compressed, length, preview = encode_content(content)
+        cursor.execute(
+            "INSERT INTO notes (content, compressed, content_length, preview) VALUES (?, ?, ?, ?)",
+            (stored, compressed, length, preview)
+        )
+        return cursor.lastrowid
+
+    def get_all_notes(self):
+        """Get all notes from database as (id, preview, created_at, content_length)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # Large notes are listed by their preview so compressed bodies are never read here
+            cursor.execute(
+                "SELECT id, COALESCE(preview, content), created_at, content_length "
+                "FROM notes ORDER BY created_at DESC, id DESC"
+            )
+            return cursor.fetchall()
+
+    def get_note(self, note_id):
+        """Get a single note with its full content"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id, content, created_at, compressed FROM notes WHERE id = ?",
+                (note_id,)
+            )
+            note = cursor.fetchone()
+            if note is None:
+                return None
+            return (note[0], decode_content(note[1], note[3]), note[2])
+
+    def add_note(self, content):
+        """Add a new note to database"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            note_id = self.insert_note(cursor, content)
+            conn.commit()
+            # Get the ID of the inserted note
+            cursor.execute("SELECT created_at FROM notes WHERE id = ?", (note_id,))
+            return (note_id, content, cursor.fetchone()[0])
+
+    def delete_note(self, note_id):
+        """Delete a note from database"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def count_notes(self):
+        """Return the number of notes in the database"""
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+
+class _SkipListNode:
+    __slots__ = ('key', 'value', 'forward')
+
+    def __init__(self, key, value, level):
+        self.key = key
+        self.value = value
+        self.forward = [None] * level
+
+
+class SortedIndex:
+    """Skip list keyed by (created_at, id) with O(log n) expected insert and delete"""
+
+    MAX_LEVEL = 32
+
+    def __init__(self):
+        self.head = _SkipListNode(None, None, self.MAX_LEVEL)
+        self.level = 1
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _random_level(self):
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def _find_predecessors(self, key):
+        """Return the last node before key on every level"""
+        update = [self.head] * self.MAX_LEVEL
+        node = self.head
+        for i in range(self.level - 1, -1, -1):
+            while node.forward[i] is not None and node.forward[i].key < key:
+                node = node.forward[i]
+            update[i] = node
+        return update
+
+    def insert(self, key, value):
+        """Insert value under key (keys are unique)"""
+        update = self._find_predecessors(key)
+        level = self._random_level()
+        if level > self.level:
+            self.level = level
+
+        node = _SkipListNode(key, value, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+        self.size += 1
+
+    def remove(self, key):
+        """Remove key, returning True if it was present"""
+        update = self._find_predecessors(key)
+        node = update[0].forward[0]
+        if node is None or node.key != key:
+            return False
+
+        for i in range(self.level):
+            if update[i].forward[i] is not node:
+                break
+            update[i].forward[i] = node.forward[i]
+        while self.level > 1 and self.head.forward[self.level - 1] is None:
+            self.level -= 1
+        self.size -= 1
+        return True
+
+    def values(self):
+        """Return values in ascending key order"""
+        result = []
+        node = self.head.forward[0]
+        while node is not None:
+            result.append(node.value)
+            node = node.forward[0]
+        return result
+
+
+class MemoryStorageEngine(StorageEngine):
+    """Notes kept in memory, optionally snapshotted to a JSON file every snapshot_interval seconds"""
+
+    name = 'memory'
+
+    def __init__(self, snapshot_path=None, snapshot_interval=60):
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.notes = {}
+        self.index = SortedIndex()
+        self.next_id = 1
+        self.dirty = False
+        self.lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._snapshot_thread = None
+
+        if self.snapshot_path:
+            self.load_snapshot()
+            if self.snapshot_interval:
+                self._snapshot_thread = threading.Thread(
+                    target=self._snapshot_loop, name='notes-snapshot', daemon=True
+                )
+                self._snapshot_thread.start()
+
+    def _timestamp(self):
+        """Current UTC time in the same format as SQLite's CURRENT_TIMESTAMP"""
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+    def _store(self, note_id, content, created_at):
+        """Add a note to the id map and the created_at index"""
+        stored, compressed, length, preview = encode_content(content)
+        self.notes[note_id] = (stored, compressed, created_at, length, preview)
+        self.index.insert((created_at, note_id), note_id)
+        self.next_id = max(self.next_id, note_id + 1)
+
+    def get_all_notes(self):
+        """Get all notes as (id, preview, created_at, content_length), newest first"""
+        with self.lock:
+            result = []
+            for note_id in reversed(self.index.values()):
+                stored, compressed, created_at, length, preview = self.notes[note_id]
+                result.append((note_id, preview if preview is not None else stored, created_at, length))
+            return result
+
+    def get_note(self, note_id):
+        """Get a single note with its full content"""
+        with self.lock:
+            note = self.notes.get(note_id)
+            if note is None:
+                return None
+            stored, compressed, created_at, _, _ = note
+            return (note_id, decode_content(stored, compressed), created_at)
+
+    def add_note(self, content):
+        """Add a new note"""
+        with self.lock:
+            note_id = self.next_id
+            created_at = self._timestamp()
+            self._store(note_id, content, created_at)
+            self.dirty = True
+            return (note_id, content, created_at)
+
+    def delete_note(self, note_id):
+        """Delete a note"""
+        with self.lock:
+            note = self.notes.pop(note_id, None)
+            if note is None:
+                return False
+            self.index.remove((note[2], note_id))
+            self.dirty = True
+            return True
+
+    def count_notes(self):
+        """Return the number of notes held in memory"""
+        with self.lock:
+            return len(self.notes)
+
+    def load_snapshot(self):
+        """Load notes from the snapshot file if there is one"""
+        if not os.path.exists(self.snapshot_path):
+            return
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self.lock:
+            for note in data.get('notes', []):
+                self._store(note['id'], note['content'], note['created_at'])
+            self.next_id = max(self.next_id, data.get('next_id', 1))
+        print(f"Loaded {len(self.notes)} notes from snapshot: {self.snapshot_path}")
+
+    def save_snapshot(self):
+        """Write all notes to the snapshot file if anything changed since the last one"""
+        if not self.snapshot_path:
+            return False
+        # Only copy the stored tuples under the lock; decompressing happens after releasing it
+        with self.lock:
+            if not self.dirty:
+                return False
+            next_id = self.next_id
+            rows = [(note_id,) + self.notes[note_id][:3] for note_id in self.index.values()]
+            self.dirty = False
+
+        data = {
+            'next_id': next_id,
+            'notes': [
+                {'id': note_id, 'content': decode_content(stored, compressed), 'created_at': created_at}
+                for note_id, stored, compressed, created_at in rows
+            ]
+        }
+
+        # Write to a per-process temporary file first so a crash never leaves a half-written
+        # snapshot and concurrent writers never share a temp file
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.snapshot_path)
+        return True
+
+    def _snapshot_loop(self):
+        """Periodically write snapshots until the engine is closed"""
+        while not self._stop_event.wait(self.snapshot_interval):
+            try:
+                self.save_snapshot()
+            except Exception as e:
+                self.dirty = True
+                print(f"Snapshot error: {e}")
+
+    def close(self):
+        """Stop the snapshot thread and write a final snapshot"""
+        self._stop_event.set()
+        if self._snapshot_thread:
+            self._snapshot_thread.join(timeout=5)
+            self._snapshot_thread = None
+        self.save_snapshot()
+
+
+ENGINES = {
+    SQLiteStorageEngine.name: SQLiteStorageEngine,
+    MemoryStorageEngine.name: MemoryStorageEngine,
+}
+
+
+def create_storage_engine(name='sqlite', **options):
+    """Create a storage engine by name ('sqlite' or 'memory')"""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown storage engine: {name} (expected one of: {', '.join(ENGINES)})")
+    return ENGINES[name](**options)
+
+
+def create_storage_engine_from_env():
+    """Create the storage engine selected by STORAGE_ENGINE and its related environment variables"""
+    name = os.environ.get('STORAGE_ENGINE', 'sqlite')
+    if name == 'memory':
+        return create_storage_engine(
+            'memory',
+            snapshot_path=os.environ.get('MEMORY_SNAPSHOT_PATH', 'notes_snapshot.json'),
+            snapshot_interval=int(os.environ.get('MEMORY_SNAPSHOT_INTERVAL', 60))
+        )
+    return create_storage_engine(
+        name,
+        db_path=os.environ.get('DATABASE_PATH', 'notes.db'),
+        journal_mode=os.environ.get('SQLITE_JOURNAL_MODE')
+    )